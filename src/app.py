@@ -21,12 +21,22 @@ import os, time
 from flask import Flask, request, jsonify
 from dotenv import load_dotenv
 from .solver import solve_quiz_sequence
+from .jobstore import JOB_STORE, make_job_store
 
 load_dotenv()
 SECRET = os.getenv('QUIZ_SECRET')
 PORT = int(os.getenv('PORT', '8000'))
 WORKER_TIMEOUT = int(os.getenv('WORKER_TIMEOUT_SECONDS', '170'))
 
+_job_store = None
+
+
+def get_job_store():
+    global _job_store
+    if _job_store is None:
+        _job_store = make_job_store(JOB_STORE)
+    return _job_store
+
 app = Flask(__name__)
 
 @app.route('/api/quiz', methods=['POST'])
@@ -53,5 +63,35 @@ def api_quiz():
     elapsed = time.time() - start_time
     return jsonify({'ok': True, 'elapsed_seconds': elapsed, 'results': results}), 200
 
+@app.route('/api/jobs', methods=['POST'])
+def api_jobs_submit():
+    try:
+        payload = request.get_json(force=True)
+    except Exception:
+        return jsonify({'error': 'invalid json'}), 400
+
+    if payload.get('secret') != SECRET:
+        return jsonify({'error': 'invalid secret'}), 403
+
+    email = payload.get('email')
+    url = payload.get('url')
+    if not email or not url:
+        return jsonify({'error': 'email and url required'}), 400
+
+    job_id = get_job_store().submit(url, email, payload.get('secret'), timeout_seconds=WORKER_TIMEOUT)
+    return jsonify({'ok': True, 'job_id': job_id}), 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def api_jobs_status(job_id):
+    if request.headers.get('X-Quiz-Secret') != SECRET:
+        return jsonify({'error': 'invalid secret'}), 403
+
+    job = get_job_store().get(job_id)
+    if job is None:
+        return jsonify({'error': 'unknown job'}), 404
+    job.pop('secret', None)
+    job.pop('email', None)
+    return jsonify({'ok': True, 'job': job}), 200
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=PORT)
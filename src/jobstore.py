@@ -0,0 +1,195 @@
+"""
+Durable job store for quiz chains.
+
+Each job is one ``solve_quiz_sequence`` run. Solver nodes claim jobs with a
+time-limited lease, renew it with heartbeats and write step checkpoints
+(the current URL plus the results so far). When a node dies its lease expires
+and the next ``claim`` hands the job, checkpoint included, to another node.
+
+Backends subclass ``JobStore``; ``SQLiteJobStore`` is the default and relies
+on SQLite file locking, so it only coordinates nodes on one host (or one local
+volume). Nodes on different hosts need a networked backend: register it in
+``BACKENDS`` and select it with a ``scheme://location`` JOB_STORE value.
+"""
+import json
+import os
+import sqlite3
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+JOB_STORE = os.getenv("JOB_STORE", "/tmp/llm_quiz_jobs.sqlite3")
+
+
+class JobStore(ABC):
+    """Interface every job store backend implements."""
+
+    # time source for leases and deadlines; backends may take an injectable one
+    clock = staticmethod(time.time)
+
+    @abstractmethod
+    def submit(self, start_url: str, email: str, secret: str, timeout_seconds: int = 170) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    def claim(self, node_id: str, lease_seconds: float) -> Optional[Dict]:
+        """Lease the oldest pending or expired job to node_id, or return None."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def heartbeat(self, job_id: str, node_id: str, lease_seconds: float) -> bool:
+        """Extend the lease. Returns False if node_id no longer holds the job."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def checkpoint(self, job_id: str, node_id: str, current_url: Optional[str],
+                   results: List[dict], lease_seconds: float) -> bool:
+        """Record progress and extend the lease. Returns False if the lease was lost."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def finish(self, job_id: str, node_id: str, results: List[dict], error: Optional[str] = None) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+
+class SQLiteJobStore(JobStore):
+    """Job store backed by one SQLite file shared by all nodes."""
+
+    def __init__(self, path: str, max_attempts: int = 3, clock=time.time):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.clock = clock
+        # default rollback journal: WAL needs shared memory and breaks on network filesystems
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    start_url TEXT NOT NULL,
+                    current_url TEXT,
+                    email TEXT,
+                    secret TEXT,
+                    results TEXT NOT NULL DEFAULT '[]',
+                    error TEXT,
+                    node_id TEXT,
+                    lease_until REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    deadline REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    @contextmanager
+    def _connect(self):
+        # autocommit per statement; claim() opens its own BEGIN IMMEDIATE transaction
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row(row) -> Optional[Dict]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["results"] = json.loads(job["results"] or "[]")
+        return job
+
+    def submit(self, start_url: str, email: str, secret: str, timeout_seconds: int = 170) -> str:
+        job_id = uuid.uuid4().hex
+        now = self.clock()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, start_url, current_url, email, secret, deadline, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, PENDING, start_url, start_url, email, secret, now + timeout_seconds, now, now),
+            )
+        return job_id
+
+    def claim(self, node_id: str, lease_seconds: float) -> Optional[Dict]:
+        now = self.clock()
+        with self._connect() as conn:
+            # BEGIN IMMEDIATE takes the write lock up front so two nodes never lease the same job
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # jobs whose node died past their attempt budget are closed out instead of re-leased
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = 'lease expired too many times', node_id = NULL,"
+                    " lease_until = NULL, updated_at = ?"
+                    " WHERE status = ? AND lease_until < ? AND attempts >= ?",
+                    (FAILED, now, RUNNING, now, self.max_attempts),
+                )
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? OR (status = ? AND lease_until < ?)"
+                    " ORDER BY created_at LIMIT 1",
+                    (PENDING, RUNNING, now),
+                ).fetchone()
+                job = None
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, node_id = ?, lease_until = ?, attempts = attempts + 1,"
+                        " updated_at = ? WHERE id = ?",
+                        (RUNNING, node_id, now + lease_seconds, now, row["id"]),
+                    )
+                    job = self._row(conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+                conn.execute("COMMIT")
+                return job
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _update_owned(self, job_id: str, node_id: str, sets: str, args: tuple) -> bool:
+        with self._connect() as conn:
+            cur = conn.execute(
+                f"UPDATE jobs SET {sets}, updated_at = ? WHERE id = ? AND node_id = ? AND status = ?",
+                args + (self.clock(), job_id, node_id, RUNNING),
+            )
+            return cur.rowcount == 1
+
+    def heartbeat(self, job_id: str, node_id: str, lease_seconds: float) -> bool:
+        return self._update_owned(job_id, node_id, "lease_until = ?", (self.clock() + lease_seconds,))
+
+    def checkpoint(self, job_id: str, node_id: str, current_url: Optional[str],
+                   results: List[dict], lease_seconds: float) -> bool:
+        return self._update_owned(
+            job_id, node_id, "current_url = ?, results = ?, lease_until = ?",
+            (current_url, json.dumps(results, default=str), self.clock() + lease_seconds),
+        )
+
+    def finish(self, job_id: str, node_id: str, results: List[dict], error: Optional[str] = None) -> bool:
+        return self._update_owned(
+            job_id, node_id, "status = ?, results = ?, error = ?, lease_until = NULL",
+            (FAILED if error else DONE, json.dumps(results, default=str), error),
+        )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            return self._row(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+
+BACKENDS = {"sqlite": SQLiteJobStore}
+
+
+def make_job_store(spec: str) -> JobStore:
+    """Build a store from ``scheme://location``; a bare path means SQLite."""
+    scheme, sep, location = spec.partition("://")
+    if not sep:
+        scheme, location = "sqlite", spec
+    if scheme not in BACKENDS:
+        raise ValueError(f"unknown job store backend: {scheme}")
+    return BACKENDS[scheme](location)
@@ -172,11 +172,20 @@ def _post_answer(submit_url: str, email: str, secret: str, url: str, answer, tim
 # -----------------------------------------------------------------------------
 # Main solver
 # -----------------------------------------------------------------------------
-def solve_quiz_sequence(start_url: str, email: str, secret: str, timeout_seconds: int = 170):
+def solve_quiz_sequence(start_url: str, email: str, secret: str, timeout_seconds: int = 170,
+                        results: Optional[List[dict]] = None, on_step=None, should_stop=None):
+    """
+    Solve the chain starting at start_url and return the per-step results.
+
+    results seeds the output when resuming a chain mid-sequence. on_step, if
+    given, is called as on_step(next_url, results) after every submission;
+    returning False stops the run (e.g. the job lease was lost). should_stop,
+    if given, is checked before each page visit and each submission.
+    """
     logger.info(f"START solve_quiz_sequence for {start_url} with timeout {timeout_seconds}s")
 
     deadline = time.time() + timeout_seconds
-    out_results = []
+    out_results = list(results or [])
 
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True, args=["--no-sandbox", "--disable-dev-shm-usage"])
@@ -186,6 +195,9 @@ def solve_quiz_sequence(start_url: str, email: str, secret: str, timeout_seconds
         current_url = start_url
 
         while time.time() < deadline and current_url:
+            if should_stop is not None and should_stop():
+                logger.info("STOP requested before visit")
+                break
             logger.info(f"VISIT {current_url}")
             try:
                 page.goto(current_url, wait_until="domcontentloaded", timeout=30000)
@@ -221,6 +233,9 @@ def solve_quiz_sequence(start_url: str, email: str, secret: str, timeout_seconds
                 submit_url = f"{parsed.scheme}://{parsed.netloc}/submit"
 
             # post answer
+            if should_stop is not None and should_stop():
+                logger.info("STOP requested before submit")
+                break
             logger.info("SUBMIT to %s", submit_url)
             resp = _post_answer(submit_url, email, secret, current_url, derived["answer"])
 
@@ -235,6 +250,9 @@ def solve_quiz_sequence(start_url: str, email: str, secret: str, timeout_seconds
 
             # follow next URL
             next_url = resp.get("url")
+            if on_step is not None and on_step(next_url, out_results) is False:
+                logger.info("STOP requested by on_step")
+                break
             if next_url:
                 logger.info(f"FOLLOW NEXT URL → {next_url}")
                 current_url = next_url
@@ -0,0 +1,118 @@
+"""
+Solver node: pulls quiz chains from the shared job store and runs them.
+
+Run one per container (``python -m src.worker``); all nodes pointed at the
+same JOB_STORE share the queue. A background thread renews the lease while a
+step runs, ownership is re-checked before every page visit and submission,
+and every step is checkpointed so a node that picks up an expired job
+continues from the last submitted URL.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+
+from src.jobstore import JOB_STORE, JobStore, make_job_store
+
+logger = logging.getLogger(__name__)
+
+LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "30"))
+POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1"))
+
+
+def _default_solve(*args, **kwargs):
+    # imported lazily so the store can be used without Playwright installed
+    from src.solver import solve_quiz_sequence
+    return solve_quiz_sequence(*args, **kwargs)
+
+
+def run_job(store: JobStore, job: dict, node_id: str, lease_seconds: float = LEASE_SECONDS, solve=None):
+    """Run one claimed job to completion, resuming from its checkpoint."""
+    solve = solve or _default_solve
+    job_id = job["id"]
+    results = job["results"]
+    lost = threading.Event()
+    stop = threading.Event()
+
+    def _heartbeat():
+        while not stop.wait(lease_seconds / 3):
+            try:
+                held = store.heartbeat(job_id, node_id, lease_seconds)
+            except Exception:
+                # e.g. "database is locked": try again on the next tick
+                logger.warning("heartbeat for job %s on %s failed, retrying", job_id, node_id, exc_info=True)
+                continue
+            if not held:
+                lost.set()
+                return
+
+    def _still_held(renew):
+        # a store error means ownership can't be confirmed: stop without finish()
+        # so the job is reclaimed once the lease expires instead of being failed
+        if lost.is_set():
+            return False
+        try:
+            held = renew()
+        except Exception:
+            logger.warning("store error for job %s on %s, giving up the job", job_id, node_id, exc_info=True)
+            held = False
+        if not held:
+            logger.warning("lease lost for job %s on %s", job_id, node_id)
+            lost.set()
+        return held
+
+    def _on_step(next_url, step_results):
+        results[:] = step_results
+        return _still_held(lambda: store.checkpoint(job_id, node_id, next_url, step_results, lease_seconds))
+
+    def _should_stop():
+        # renew-and-verify so a node that lost its lease never visits or submits again
+        return not _still_held(lambda: store.heartbeat(job_id, node_id, lease_seconds))
+
+    if not job["current_url"]:
+        # previous node checkpointed the last step but died before finishing
+        store.finish(job_id, node_id, results)
+        return
+    remaining = job["deadline"] - store.clock()
+    if remaining <= 0:
+        store.finish(job_id, node_id, results, error="deadline passed")
+        return
+
+    beat = threading.Thread(target=_heartbeat, daemon=True)
+    beat.start()
+    try:
+        out = solve(job["current_url"], job["email"], job["secret"],
+                    timeout_seconds=remaining, results=results, on_step=_on_step, should_stop=_should_stop)
+    except Exception as e:
+        logger.exception("job %s failed on %s", job_id, node_id)
+        if not lost.is_set():
+            store.finish(job_id, node_id, results, error=repr(e))
+        return
+    finally:
+        stop.set()
+        beat.join()
+
+    if not lost.is_set():
+        store.finish(job_id, node_id, out)
+
+
+def run_worker(store: JobStore, node_id: str, lease_seconds: float = LEASE_SECONDS,
+               poll_seconds: float = POLL_SECONDS, solve=None, stop_event=None, max_jobs=None):
+    """Claim and run jobs until stop_event is set or max_jobs have been processed."""
+    done = 0
+    while not (stop_event and stop_event.is_set()) and (max_jobs is None or done < max_jobs):
+        job = store.claim(node_id, lease_seconds)
+        if job is None:
+            time.sleep(poll_seconds)
+            continue
+        logger.info("node %s claimed job %s at %s", node_id, job["id"], job["current_url"])
+        run_job(store, job, node_id, lease_seconds, solve)
+        done += 1
+    return done
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    node = os.getenv("NODE_ID") or f"{socket.gethostname()}-{os.getpid()}"
+    run_worker(make_job_store(JOB_STORE), node)
@@ -0,0 +1,187 @@
+import gzip
+import hashlib
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from src.utils.google_drive import download_drive_file
+
+PAYLOAD = os.urandom(100_000)
+
+
+class _Remote:
+    """Local keep-alive stand-in for Drive, optionally range-capable."""
+
+    def __init__(self, payload, ranges=True, fail_ranges=None, etag="v1", confirm=False, short_ranges=None,
+                 gzip_body=False):
+        self.payload = payload
+        self.etag = etag
+        self.hits = []
+        self.connections = set()
+        remote = self
+        fail_ranges = set(fail_ranges or ())
+        short_ranges = set(short_ranges or ())
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body=b"", headers=()):
+                if gzip_body and body and "gzip" in (self.headers.get("Accept-Encoding") or ""):
+                    # like real servers, Content-Range offsets stay relative to the unencoded file
+                    body = gzip.compress(body)
+                    headers = list(headers) + [("Content-Encoding", "gzip")]
+                self.send_response(status)
+                for k, v in headers:
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                remote.connections.add(self.client_address)
+                rng = self.headers.get("Range")
+                remote.hits.append(rng)
+                if confirm and "confirm=tok" not in self.path:
+                    return self._send(200, b"<html>warning</html>",
+                                      [("Set-Cookie", "download_warning_1=tok; Path=/")])
+                if confirm and "download_warning_1=tok" not in (self.headers.get("Cookie") or ""):
+                    return self._send(403)
+                data = remote.payload
+                validator = [("ETag", remote.etag)]
+                m = re.match(r"bytes=(\d+)-(\d+)", rng or "")
+                if not (ranges and m):
+                    return self._send(200, data, validator)
+                start = int(m.group(1))
+                if start >= len(data):
+                    return self._send(416, headers=[("Content-Range", f"bytes */{len(data)}")])
+                if start in fail_ranges:
+                    fail_ranges.discard(start)
+                    return self._send(500)
+                end = min(int(m.group(2)), len(data) - 1)
+                body = data[start:end + 1]
+                if start in short_ranges:
+                    # advertise the full range but send only half of it
+                    body = body[:len(body) // 2]
+                self._send(206, body,
+                           validator + [("Content-Range", f"bytes {start}-{end}/{len(data)}")])
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/uc"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _read(path):
+    with open(path, "rb") as fh:
+        return fh.read()
+
+
+def test_parallel_ranged_download(tmp_path):
+    with _Remote(PAYLOAD) as remote:
+        dest = str(tmp_path / "out.bin")
+        sha = hashlib.sha256(PAYLOAD).hexdigest()
+        download_drive_file("abc", dest, url=remote.url, part_size=16_384, workers=4, expected_sha256=sha)
+        assert _read(dest) == PAYLOAD
+        assert not os.path.exists(dest + ".part")
+        assert len([h for h in remote.hits if h != "bytes=0-0"]) == 7
+
+
+def test_connections_reused_across_calls(tmp_path):
+    with _Remote(PAYLOAD) as remote:
+        download_drive_file("abc", str(tmp_path / "a.bin"), url=remote.url, part_size=16_384, workers=4)
+        first = set(remote.connections)
+        download_drive_file("abc", str(tmp_path / "b.bin"), url=remote.url, part_size=16_384, workers=4)
+        assert remote.connections == first
+        assert len(first) <= 4
+
+
+def test_confirm_cookie_sent_on_range_requests(tmp_path):
+    with _Remote(PAYLOAD, confirm=True) as remote:
+        dest = str(tmp_path / "out.bin")
+        download_drive_file("abc", dest, url=remote.url, part_size=16_384, workers=4)
+        assert _read(dest) == PAYLOAD
+
+
+def test_empty_file(tmp_path):
+    with _Remote(b"") as remote:
+        dest = str(tmp_path / "empty.bin")
+        download_drive_file("abc", dest, url=remote.url)
+        assert _read(dest) == b""
+
+
+def test_resume_after_failed_range(tmp_path):
+    with _Remote(PAYLOAD, fail_ranges={32_768}) as remote:
+        dest = str(tmp_path / "out.bin")
+        with pytest.raises(requests.HTTPError):
+            download_drive_file("abc", dest, url=remote.url, part_size=16_384, workers=1, max_retries=0)
+        assert os.path.exists(dest + ".part.json")
+
+        del remote.hits[:]
+        download_drive_file("abc", dest, url=remote.url, part_size=16_384, workers=1)
+        assert _read(dest) == PAYLOAD
+        # parts 0 and 1 were kept from the first attempt
+        assert "bytes=0-16383" not in remote.hits
+        assert "bytes=16384-32767" not in remote.hits
+
+
+def test_resume_discarded_when_remote_changes(tmp_path):
+    with _Remote(PAYLOAD, fail_ranges={32_768}) as remote:
+        dest = str(tmp_path / "out.bin")
+        with pytest.raises(requests.HTTPError):
+            download_drive_file("abc", dest, url=remote.url, part_size=16_384, workers=1, max_retries=0)
+
+        replacement = os.urandom(len(PAYLOAD))
+        remote.payload, remote.etag = replacement, "v2"
+        download_drive_file("abc", dest, url=remote.url, part_size=16_384, workers=1)
+        assert _read(dest) == replacement
+
+
+def test_short_range_raises_value_error(tmp_path):
+    with _Remote(PAYLOAD, short_ranges={16_384}) as remote:
+        with pytest.raises(ValueError):
+            download_drive_file("abc", str(tmp_path / "out.bin"), url=remote.url,
+                                part_size=16_384, workers=1, max_retries=0)
+
+
+@pytest.mark.parametrize("ranges", [True, False])
+def test_gzip_capable_server(tmp_path, ranges):
+    payload = b"compressible " * 10_000
+    with _Remote(payload, ranges=ranges, gzip_body=True) as remote:
+        dest = str(tmp_path / "out.bin")
+        download_drive_file("abc", dest, url=remote.url, part_size=16_384, workers=4)
+        assert _read(dest) == payload
+
+
+def test_fallback_without_ranges(tmp_path):
+    with _Remote(PAYLOAD, ranges=False) as remote:
+        dest = str(tmp_path / "out.bin")
+        download_drive_file("abc", dest, url=remote.url)
+        assert _read(dest) == PAYLOAD
+
+
+def test_hash_mismatch(tmp_path):
+    with _Remote(PAYLOAD) as remote:
+        dest = str(tmp_path / "bad.bin")
+        with pytest.raises(ValueError):
+            download_drive_file("abc", dest, url=remote.url, expected_sha256="0" * 64)
+        assert not os.path.exists(dest)
+
+
+def test_max_bytes(tmp_path):
+    with _Remote(PAYLOAD) as remote:
+        with pytest.raises(ValueError):
+            download_drive_file("abc", str(tmp_path / "big.bin"), url=remote.url, max_bytes=10)
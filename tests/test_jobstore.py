@@ -0,0 +1,165 @@
+import sqlite3
+import time
+
+import pytest
+
+from src.jobstore import DONE, FAILED, RUNNING, JobStore, SQLiteJobStore, make_job_store
+from src.worker import run_job, run_worker
+
+
+class _Clock:
+    """Manually advanced clock so lease expiry never depends on real timing."""
+
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def _fake_solve(chain, before_post=None):
+    """Walk a url -> next_url map the way solve_quiz_sequence does."""
+    def solve(start_url, email, secret, timeout_seconds=170, results=None, on_step=None, should_stop=None):
+        out = list(results or [])
+        url = start_url
+        while url:
+            if should_stop is not None and should_stop():
+                break
+            if before_post is not None:
+                before_post(url)
+            if should_stop is not None and should_stop():
+                break
+            nxt = chain.get(url)
+            out.append({"url": url})
+            if on_step is not None and on_step(nxt, out) is False:
+                break
+            url = nxt
+        return out
+    return solve
+
+
+CHAIN = {"http://q/1": "http://q/2", "http://q/2": "http://q/3", "http://q/3": None}
+
+
+def test_claim_is_exclusive_and_expired_lease_is_reclaimed(tmp_path):
+    clock = _Clock()
+    store = SQLiteJobStore(str(tmp_path / "jobs.db"), clock=clock)
+    job_id = store.submit("http://q/1", "a@b.c", "s")
+
+    job = store.claim("node-a", lease_seconds=30)
+    assert job["id"] == job_id and job["status"] == RUNNING
+    clock.advance(29)
+    assert store.claim("node-b", lease_seconds=30) is None
+
+    clock.advance(2)
+    job = store.claim("node-b", lease_seconds=30)
+    assert job["node_id"] == "node-b" and job["attempts"] == 2
+    # the dead node can no longer write to the job
+    assert not store.checkpoint(job_id, "node-a", "http://q/2", [], 30)
+    assert store.heartbeat(job_id, "node-b", 30)
+
+
+def test_resume_from_checkpoint_on_another_node(tmp_path):
+    clock = _Clock()
+    store = SQLiteJobStore(str(tmp_path / "jobs.db"), clock=clock)
+    job_id = store.submit("http://q/1", "a@b.c", "s")
+
+    # node-a solved step 1, checkpointed, then died
+    store.claim("node-a", lease_seconds=30)
+    assert store.checkpoint(job_id, "node-a", "http://q/2", [{"url": "http://q/1"}], 30)
+    clock.advance(31)
+
+    assert run_worker(store, "node-b", lease_seconds=30, poll_seconds=0, solve=_fake_solve(CHAIN), max_jobs=1) == 1
+    job = store.get(job_id)
+    assert job["status"] == DONE
+    assert [r["url"] for r in job["results"]] == ["http://q/1", "http://q/2", "http://q/3"]
+
+
+def test_node_stops_before_submitting_after_lease_loss(tmp_path):
+    clock = _Clock()
+    store = SQLiteJobStore(str(tmp_path / "jobs.db"), clock=clock)
+    job_id = store.submit("http://q/1", "a@b.c", "s")
+    job = store.claim("node-a", lease_seconds=30)
+
+    def steal(url):
+        if url == "http://q/2":
+            clock.advance(31)
+            assert store.claim("node-b", lease_seconds=30)["id"] == job_id
+
+    run_job(store, job, "node-a", lease_seconds=30, solve=_fake_solve(CHAIN, before_post=steal))
+    job = store.get(job_id)
+    assert job["node_id"] == "node-b" and job["status"] == RUNNING
+    # node-a's last checkpoint was step 1; it never submitted step 2
+    assert [r["url"] for r in job["results"]] == ["http://q/1"]
+
+
+def test_store_error_releases_job_instead_of_failing_it(tmp_path):
+    clock = _Clock()
+
+    class LockedStore(SQLiteJobStore):
+        def heartbeat(self, job_id, node_id, lease_seconds):
+            raise sqlite3.OperationalError("database is locked")
+
+    store = LockedStore(str(tmp_path / "jobs.db"), clock=clock)
+    job_id = store.submit("http://q/1", "a@b.c", "s")
+    run_job(store, store.claim("node-a", 30), "node-a", lease_seconds=30, solve=_fake_solve(CHAIN))
+    job = store.get(job_id)
+    # nothing was submitted and the job is left for another node to reclaim
+    assert job["status"] == RUNNING and job["results"] == []
+    clock.advance(31)
+    assert store.claim("node-b", 30)["id"] == job_id
+
+
+def test_deadline_uses_store_clock(tmp_path):
+    clock = _Clock()
+    store = SQLiteJobStore(str(tmp_path / "jobs.db"), clock=clock)
+    job_id = store.submit("http://q/1", "a@b.c", "s", timeout_seconds=170)
+    job = store.claim("node-a", 30)
+    clock.advance(171)
+
+    def never(*args, **kwargs):
+        raise AssertionError("solve must not run past the deadline")
+
+    run_job(store, job, "node-a", lease_seconds=30, solve=never)
+    job = store.get(job_id)
+    assert job["status"] == FAILED and job["error"] == "deadline passed"
+
+
+def test_failed_solve_is_recorded(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.db"))
+
+    def boom(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    job_id = store.submit("http://q/1", "a@b.c", "s")
+    run_job(store, store.claim("node-a", 30), "node-a", solve=boom)
+    assert store.get(job_id)["status"] == FAILED
+
+
+def test_attempt_budget_fails_abandoned_job(tmp_path):
+    clock = _Clock()
+    store = SQLiteJobStore(str(tmp_path / "jobs.db"), max_attempts=1, clock=clock)
+    job_id = store.submit("http://q/1", "a@b.c", "s")
+    store.claim("node-a", lease_seconds=30)
+    clock.advance(31)
+    assert store.claim("node-b", 30) is None
+    assert store.get(job_id)["status"] == FAILED
+
+
+def test_make_job_store_backends(tmp_path):
+    assert isinstance(make_job_store(str(tmp_path / "jobs.db")), SQLiteJobStore)
+    assert isinstance(make_job_store("sqlite://" + str(tmp_path / "other.db")), SQLiteJobStore)
+    with pytest.raises(ValueError):
+        make_job_store("redis://localhost")
+
+
+def test_incomplete_backend_cannot_be_created():
+    class HalfStore(JobStore):
+        def submit(self, start_url, email, secret, timeout_seconds=170):
+            return "x"
+
+    with pytest.raises(TypeError):
+        HalfStore()
@@ -0,0 +1,71 @@
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("playwright.sync_api")
+
+from src import solver
+
+
+@pytest.fixture
+def fake_browser(monkeypatch):
+    """Patch out Playwright, the answer logic and submissions; returns the answer mock."""
+    page = mock.MagicMock()
+    page.content.return_value = "<html>quiz</html>"
+    page.query_selector_all.return_value = []
+    playwright = mock.MagicMock()
+    playwright.__enter__.return_value.chromium.launch.return_value.new_context.return_value.new_page.return_value = page
+
+    monkeypatch.setattr(solver, "sync_playwright", mock.MagicMock(return_value=playwright))
+    monkeypatch.setattr(solver, "_debug_dump_page", mock.MagicMock())
+    monkeypatch.setattr(solver, "derive_answer_from_page", mock.MagicMock(return_value={"answer": 42}))
+    post = mock.MagicMock()
+    monkeypatch.setattr(solver, "_post_answer", post)
+    return page, post
+
+
+def test_resumes_from_seeded_results(fake_browser):
+    page, post = fake_browser
+    post.side_effect = [{"url": "http://q/3"}, {}]
+    steps = []
+
+    out = solver.solve_quiz_sequence(
+        "http://q/2", "a@b.c", "s", results=[{"url": "http://q/1"}],
+        on_step=lambda next_url, res: steps.append((next_url, len(res))),
+    )
+
+    assert [r["url"] for r in out] == ["http://q/1", "http://q/2", "http://q/3"]
+    assert [c.args[0] for c in page.goto.call_args_list] == ["http://q/2", "http://q/3"]
+    assert steps == [("http://q/3", 2), (None, 3)]
+
+
+def test_on_step_false_stops_chain(fake_browser):
+    page, post = fake_browser
+    post.return_value = {"url": "http://q/2"}
+
+    out = solver.solve_quiz_sequence("http://q/1", "a@b.c", "s", on_step=lambda next_url, res: False)
+
+    assert [r["url"] for r in out] == ["http://q/1"]
+    assert post.call_count == 1
+
+
+def test_should_stop_before_submit_skips_post(fake_browser):
+    page, post = fake_browser
+    checks = iter([False, True])
+
+    out = solver.solve_quiz_sequence("http://q/1", "a@b.c", "s", should_stop=lambda: next(checks))
+
+    assert out == []
+    page.goto.assert_called_once()
+    post.assert_not_called()
+
+
+def test_should_stop_before_visit_skips_page(fake_browser):
+    page, post = fake_browser
+
+    out = solver.solve_quiz_sequence("http://q/1", "a@b.c", "s", results=[{"url": "http://q/0"}],
+                                     should_stop=lambda: True)
+
+    assert out == [{"url": "http://q/0"}]
+    page.goto.assert_not_called()
+    post.assert_not_called()